@@ -1,142 +1,457 @@
+import asyncio
+import functools
+import hashlib
+import importlib.util
+import queue
+import sys
+import threading
+from dataclasses import dataclass, fields
+import numpy as np
+from diskcache import Cache
+import orjson
 import streamlit as st
 from datetime import datetime
-import google.generativeai as genai
 from streamlit.components.v1 import html
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 
-# Try to import OpenAI, but don't fail if it's not available
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+# The provider SDKs are heavy, so they are only imported once selected (see setup_*).
+# Check that OpenAI is installed without importing it.
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+
+PLATFORMS = ["LinkedIn", "Twitter", "WhatsApp"]
+GEMINI_MODEL_NAME = "gemini-2.5-flash"
+OPENAI_MODEL_NAME = "gpt-4o-mini"
+OPENAI_MODELS = [OPENAI_MODEL_NAME, "gpt-4o", "gpt-3.5-turbo"]
+
+# Platform-specific requirements; single-platform prompts only include their own
+RULES = {
+    "LinkedIn": "Professional tone, include relevant hashtags, structured format",
+    "Twitter": "Concise (under 280 characters), engaging, include hashtags",
+    "WhatsApp": "Casual tone, use emojis, clear formatting with event details",
+}
+
+# Prompt templates, filled in with str.format() once per request
+PROMPT_TEMPLATE = """Generate a {platform} post for an event with the following details:
+Event Name: {spec.event_name}
+Date: {spec.date}
+Venue: {spec.venue}
+Description: {spec.description}
+
+Requirements: {rules}
+
+Generate only the post content without any explanations."""
+
+BATCH_PROMPT_TEMPLATE = """Return a JSON object with keys linkedin, twitter, whatsapp containing posts for an event with the following details:
+Event Name: {spec.event_name}
+Date: {spec.date}
+Venue: {spec.venue}
+Description: {spec.description}
+
+Each value must follow the platform-specific rules below:
+{rules}
+
+Return only the JSON object without any explanations."""
+
+# Batched prompts send every platform's rules, but only once
+ALL_RULES = "\n".join(f"- {platform}: {rules}" for platform, rules in RULES.items())
+
+ERROR_PREFIX = "Error generating post:"
+
+# Successful responses are also kept on disk so they survive restarts and are shared across sessions
+DISK_CACHE_DIR = ".llm_cache"
+DISK_CACHE_TTL = 86400
 
-def create_copy_button(text, button_id):
+# Semantic cache: reuse posts when name, date and venue match and the description embeds this close
+SIMILARITY_THRESHOLD = 0.95
+EMBEDDING_MODELS = {"Gemini": "models/text-embedding-004", "ChatGPT": "text-embedding-3-small"}
+
+# Height of the single iframe holding all copy buttons; fits three ~36px rows
+# when a narrow column wraps each button onto its own line
+COPY_BUTTONS_HEIGHT = 150
+
+_CSS = """
+<style>
+.stTextInput > div > div > input {
+    background-color: #f0f2f6;
+}
+.stTextArea > div > div > textarea {
+    background-color: #f0f2f6;
+}
+</style>
+"""
+
+# Copy button markup; {{ID}}, {{LABEL}} and {{TEXT_JS}} are filled in by create_copy_button
+_COPY_TEMPLATE = """
+<div style="position: relative; margin-bottom: 15px;">
+    <button
+        onclick="copyText_{{ID}}(this)"
+        style="
+            background-color: white;
+            border: 1px solid #ccc;
+            padding: 8px 15px;
+            border-radius: 5px;
+            cursor: pointer;
+            display: flex;
+            align-items: center;
+            gap: 5px;
+            font-size: 14px;
+        "
+    >
+        <span style="font-size: 16px;">📋</span>
+        <span>{{LABEL}}</span>
+    </button>
+    <script>
+        async function copyText_{{ID}}(button) {
+            var text = {{TEXT_JS}};
+            var originalText = button.innerHTML;
+            try {
+                if (navigator.clipboard) {
+                    await navigator.clipboard.writeText(text);
+                } else {
+                    // The Clipboard API only exists in secure contexts, e.g. not on http://<lan-ip>
+                    var textarea = document.createElement("textarea");
+                    textarea.value = text;
+                    textarea.style.position = "absolute";
+                    textarea.style.top = "-9999px";
+                    document.body.appendChild(textarea);
+                    textarea.select();
+                    var copied = document.execCommand("copy");
+                    document.body.removeChild(textarea);
+                    if (!copied) throw new Error("Copy command was rejected");
+                }
+                button.innerHTML = '<span>✓ Copied!</span>';
+            } catch (e) {
+                button.innerHTML = '<span>✗ Copy failed</span>';
+            }
+            setTimeout(function() {
+                button.innerHTML = originalText;
+            }, 2000);
+        }
+    </script>
+</div>
+"""
+
+@dataclass(frozen=True, slots=True)
+class EventSpec:
+    """Validated event details shared by every generation call (hashable, so usable as a cache key)"""
+    event_name: str
+    date: str
+    venue: str
+    description: str
+    
+    def __post_init__(self):
+        for spec_field in fields(self):
+            # Frozen, so normalise through object.__setattr__
+            object.__setattr__(self, spec_field.name, getattr(self, spec_field.name).strip())
+        if not all([self.event_name, self.date, self.venue, self.description]):
+            raise ValueError("Please fill in all the event details")
+
+def create_copy_button(text, button_id, label="Copy"):
     """Create an HTML/JavaScript copy button that won't affect the page state"""
-    copy_button_html = f"""
-        <div style="position: relative; margin-bottom: 15px;">
-            <button 
-                onclick="copyText_{button_id}()"
-                style="
-                    background-color: white;
-                    border: 1px solid #ccc;
-                    padding: 8px 15px;
-                    border-radius: 5px;
-                    cursor: pointer;
-                    display: flex;
-                    align-items: center;
-                    gap: 5px;
-                    font-size: 14px;
-                "
-            >
-                <span style="font-size: 16px;">📋</span>
-                <span>Copy</span>
-            </button>
-            <textarea id="textToCopy_{button_id}" style="position: absolute; top: -9999px;">{text}</textarea>
-            <script>
-                function copyText_{button_id}() {{
-                    var copyText = document.getElementById("textToCopy_{button_id}");
-                    copyText.select();
-                    document.execCommand("copy");
-                    var button = event.target;
-                    if (button.tagName === 'SPAN') button = button.parentElement;
-                    var originalText = button.innerHTML;
-                    button.innerHTML = '<span>✓ Copied!</span>';
-                    setTimeout(function() {{
-                        button.innerHTML = originalText;
-                    }}, 2000);
-                }}
-            </script>
-        </div>
+    # Embed the text as a JS string literal with no "<" left for the HTML parser to see
+    text_js = orjson.dumps(text).decode().replace("<", "\\u003c")
+    # Substitute the text last so markers inside a post are never replaced
+    return (_COPY_TEMPLATE.replace("{{ID}}", button_id)
+            .replace("{{LABEL}}", label)
+            .replace("{{TEXT_JS}}", text_js))
+
+def create_copy_buttons(posts):
+    """Create one row of copy buttons for all platforms, rendered in a single component iframe"""
+    buttons = "".join(create_copy_button(post, platform.lower(), f"Copy {platform}")
+                      for platform, post in zip(PLATFORMS, posts))
+    return f'<div style="display: flex; flex-wrap: wrap; gap: 10px;">{buttons}</div>'
+
+@st.cache_resource
+def _get_event_loop():
+    """Start a single background event loop shared by all sessions and reruns.
+    
+    The async SDK clients hold connections bound to the loop they were first used
+    on, so cached clients must always run on the same loop.
     """
-    return copy_button_html
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+def submit_async(coro):
+    """Schedule a coroutine on the shared event loop and return a future for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_event_loop())
+
+def run_async(coro):
+    """Run a coroutine on the shared event loop and wait for its result"""
+    return submit_async(coro).result()
+
+def _is_transient_error(error):
+    """Whether an API error is a rate limit or temporary outage worth retrying"""
+    # Look the SDKs up in sys.modules: an error can only come from one already imported
+    google_exceptions = sys.modules.get("google.api_core.exceptions")
+    if google_exceptions is not None and isinstance(
+            error, (google_exceptions.ResourceExhausted, google_exceptions.ServiceUnavailable)):
+        return True
+    openai = sys.modules.get("openai")
+    return openai is not None and isinstance(
+        error, (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError))
+
+@retry(stop=stop_after_attempt(4), wait=wait_exponential_jitter(initial=0.5, max=8),
+       retry=retry_if_exception(_is_transient_error), reraise=True)
+async def _request_with_retry(request, *args, **kwargs):
+    """Await an API request, retrying transient failures with jittered exponential backoff"""
+    return await request(*args, **kwargs)
+
+@st.cache_resource
+def _get_disk_cache():
+    """Open the on-disk response cache shared by all sessions and restarts"""
+    return Cache(DISK_CACHE_DIR, size_limit=int(1e9))
+
+def _disk_cache_key(api_choice, model_name, prompt):
+    """Key a response on everything that determines it, without storing the prompt in the key"""
+    return hashlib.sha256(f"{api_choice}|{model_name}|{prompt}".encode()).hexdigest()
+
+def platform_request(spec, platform, api_choice, model_name):
+    """Return the prompt for one platform's post and the cache key of its response"""
+    prompt = PROMPT_TEMPLATE.format(platform=platform, spec=spec, rules=RULES[platform])
+    return prompt, _disk_cache_key(api_choice, model_name, prompt)
+
+def batch_request(spec, api_choice, model_name):
+    """Return the batched JSON prompt for all platforms and the cache key of its response"""
+    prompt = BATCH_PROMPT_TEMPLATE.format(spec=spec, rules=ALL_RULES)
+    return prompt, _disk_cache_key(api_choice, model_name, prompt)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_response(key):
+    """Memory cache in front of the disk cache; a miss raises so it is never memoized"""
+    response = _get_disk_cache().get(key)
+    if response is None:
+        raise KeyError(key)
+    return response
+
+def read_cached_response(key):
+    """Look a response up in memory, then on disk; None on a miss"""
+    try:
+        return _cached_response(key)
+    except KeyError:
+        return None
 
+# genai.configure() is process-global, so only keep the model for the latest key
+@st.cache_resource(max_entries=1)
 def setup_gemini(api_key):
     """Configure Gemini API with the provided key"""
+    import google.generativeai as genai
     genai.configure(api_key=api_key)
-    return genai.GenerativeModel('gemini-pro')
+    return genai.GenerativeModel(GEMINI_MODEL_NAME)
 
+@st.cache_resource
 def setup_chatgpt(api_key):
     """Configure ChatGPT API with the provided key"""
     if not OPENAI_AVAILABLE:
         raise ImportError("OpenAI package is not installed. Please install it using 'pip install openai'")
-    client = openai.OpenAI(api_key=api_key)
+    import openai
+    # _request_with_retry is the only retry layer; SDK retries would multiply its attempts
+    client = openai.AsyncOpenAI(api_key=api_key, max_retries=0)
     return client
 
-def generate_post_with_gemini(model, platform, event_name, date, description, venue):
-    """Generate social media post using Gemini"""
-    prompt = f"""Generate a {platform} post for an event with the following details:
-    Event Name: {event_name}
-    Date: {date}
-    Venue: {venue}
-    Description: {description}
-    
-    For {platform}, consider these specific requirements:
-    - LinkedIn: Professional tone, include relevant hashtags, structured format
-    - Twitter: Concise (under 280 characters), engaging, include hashtags
-    - WhatsApp: Casual tone, use emojis, clear formatting with event details
+async def generate_post_with_gemini(model, prompt, on_chunk=None):
+    """Generate social media post using Gemini, streaming chunks to `on_chunk` if given"""
+    try:
+        if on_chunk is None:
+            response = await _request_with_retry(model.generate_content_async, prompt)
+            return response.text.strip()
+        chunks = []
+        async for chunk in await _request_with_retry(model.generate_content_async, prompt, stream=True):
+            chunks.append(chunk.text)
+            on_chunk(chunk.text)
+        return "".join(chunks).strip()
+    except Exception as e:
+        return f"{ERROR_PREFIX} {str(e)}"
+
+async def generate_post_with_chatgpt(client, prompt, model_name, on_chunk=None):
+    """Generate social media post using ChatGPT, streaming chunks to `on_chunk` if given"""
+    try:
+        if on_chunk is None:
+            response = await _request_with_retry(
+                client.chat.completions.create,
+                model=model_name,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            return response.choices[0].message.content.strip()
+        chunks = []
+        stream = await _request_with_retry(
+            client.chat.completions.create,
+            model=model_name,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True
+        )
+        async for chunk in stream:
+            text = chunk.choices[0].delta.content or "" if chunk.choices else ""
+            chunks.append(text)
+            on_chunk(text)
+        return "".join(chunks).strip()
+    except Exception as e:
+        return f"{ERROR_PREFIX} {str(e)}"
+
+def _parse_batch_response(content):
+    """Split a batched JSON response into one post per platform.
     
-    Generate only the post content without any explanations."""
+    Platforms missing from the response or holding a non-string value become
+    errors on their own; the ones that parsed are kept.
+    """
+    try:
+        response = orjson.loads(content)
+    except orjson.JSONDecodeError as e:
+        return [f"{ERROR_PREFIX} Response is not valid JSON ({e})"] * len(PLATFORMS)
+    if not isinstance(response, dict):
+        return [f"{ERROR_PREFIX} Response JSON is not an object"] * len(PLATFORMS)
     
+    posts = []
+    for platform in PLATFORMS:
+        key = platform.lower()
+        if key not in response:
+            posts.append(f"{ERROR_PREFIX} Response JSON missing key '{key}'")
+        elif not isinstance(response[key], str):
+            posts.append(f"{ERROR_PREFIX} Response JSON value for '{key}' is not a string")
+        else:
+            posts.append(response[key].strip())
+    return posts
+
+async def generate_all_posts(model_or_client, api_choice, prompt, model_name):
+    """Generate posts for all platforms in a single API call using JSON output"""
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        if api_choice == "Gemini":
+            response = await _request_with_retry(
+                model_or_client.generate_content_async,
+                prompt,
+                generation_config={"response_mime_type": "application/json"}
+            )
+            content = response.text
+        else:
+            response = await _request_with_retry(
+                model_or_client.chat.completions.create,
+                model=model_name,
+                messages=[{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"}
+            )
+            content = response.choices[0].message.content
     except Exception as e:
-        return f"Error generating post: {str(e)}"
+        return [f"{ERROR_PREFIX} {str(e)}"] * len(PLATFORMS)
+    return _parse_batch_response(content)
 
-def generate_post_with_chatgpt(client, platform, event_name, date, description, venue):
-    """Generate social media post using ChatGPT"""
-    prompt = f"""Generate a {platform} post for an event with the following details:
-    Event Name: {event_name}
-    Date: {date}
-    Venue: {venue}
-    Description: {description}
-    
-    For {platform}, consider these specific requirements:
-    - LinkedIn: Professional tone, include relevant hashtags, structured format
-    - Twitter: Concise (under 280 characters), engaging, include hashtags
-    - WhatsApp: Casual tone, use emojis, clear formatting with event details
+async def generate_all(model, api_choice, prompts, model_name, on_chunk=None):
+    """Generate posts for all platforms concurrently, one prompt per entry in PLATFORMS.
     
-    Generate only the post content without any explanations."""
+    If `on_chunk` is given, responses are streamed and it is called as
+    `on_chunk(platform, text)` for every chunk received.
+    """
+    if api_choice == "Gemini":
+        generate = generate_post_with_gemini
+    else:
+        generate = functools.partial(generate_post_with_chatgpt, model_name=model_name)
+    # One platform failing must not discard the posts that did succeed
+    results = await asyncio.gather(*[
+        generate(model, prompt,
+                 on_chunk=functools.partial(on_chunk, platform) if on_chunk else None)
+        for platform, prompt in zip(PLATFORMS, prompts)
+    ], return_exceptions=True)
+    return [f"{ERROR_PREFIX} {str(result)}" if isinstance(result, Exception) else result
+            for result in results]
+
+def stream_posts(model, api_choice, prompts, model_name, placeholders):
+    """Generate all posts in parallel, rendering each into its placeholder as chunks arrive"""
+    chunks = queue.Queue()
+    future = asyncio.run_coroutine_threadsafe(
+        generate_all(model, api_choice, prompts, model_name,
+                     on_chunk=lambda platform, text: chunks.put((platform, text))),
+        _get_event_loop()
+    )
+    partial_posts = dict.fromkeys(PLATFORMS, "")
+    while not (future.done() and chunks.empty()):
+        try:
+            platform, text = chunks.get(timeout=0.05)
+        except queue.Empty:
+            continue
+        partial_posts[platform] += text
+        placeholders[platform].markdown(partial_posts[platform] + "▌")
+    return future.result()
+
+def generation_requests(spec, api_choice, model_name, batch_requests):
+    """Return the (prompt, cache key) pairs for one generation: one batched request, or one per platform"""
+    if batch_requests:
+        return [batch_request(spec, api_choice, model_name)]
+    return [platform_request(spec, platform, api_choice, model_name) for platform in PLATFORMS]
+
+def find_cached_posts(requests, batch_requests):
+    """Return posts for exactly these requests from the memory or disk cache, or None on any miss"""
+    responses = [read_cached_response(key) for _, key in requests]
+    if None in responses:
+        return None
+    return responses[0] if batch_requests else responses
+
+def store_posts(requests, batch_requests, posts):
+    """Write successful responses to the disk cache.
     
+    Called from the script thread so the SQLite I/O never blocks the shared event loop.
+    """
+    responses = [posts] if batch_requests else posts
+    for (_, key), response in zip(requests, responses):
+        response_posts = response if batch_requests else [response]
+        if not any(post.startswith(ERROR_PREFIX) for post in response_posts):
+            _get_disk_cache().set(key, response, expire=DISK_CACHE_TTL)
+
+def _normalize(text):
+    """Lowercase and collapse whitespace so trivially different inputs compare equal"""
+    return " ".join(text.lower().split())
+
+def similar_posts_key(spec, api_choice, model_name):
+    """Key the semantic cache on exact (normalized) name, date and venue; only the description is fuzzy"""
+    return (api_choice, model_name, _normalize(spec.event_name), _normalize(spec.date), _normalize(spec.venue))
+
+async def embed_description(model, api_choice, description):
+    """Return a unit-length embedding of the event description, or None if embedding fails"""
+    text = _normalize(description)
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        return f"Error generating post: {str(e)}"
+        if api_choice == "Gemini":
+            import google.generativeai as genai
+            response = await _request_with_retry(genai.embed_content_async,
+                                                 model=EMBEDDING_MODELS["Gemini"], content=text)
+            vector = response["embedding"]
+        else:
+            response = await _request_with_retry(model.embeddings.create,
+                                                 model=EMBEDDING_MODELS["ChatGPT"], input=text)
+            vector = response.data[0].embedding
+    except Exception:
+        return None
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+def has_similar_posts(cache_key):
+    """Whether this session has cached posts that a new event could be compared against"""
+    return cache_key in st.session_state.get("post_cache", {})
+
+def find_similar_posts(cache_key, embedding):
+    """Return posts cached this session for the most similar event above the threshold"""
+    cache = st.session_state.setdefault("post_cache", {}).get(cache_key)
+    if cache is None:
+        return None
+    # Embeddings are unit length, so one matrix-vector product gives every cosine similarity
+    similarities = cache["embeddings"] @ embedding
+    best = int(np.argmax(similarities))
+    if similarities[best] > SIMILARITY_THRESHOLD:
+        return cache["posts"][best]
+    return None
+
+def store_similar_posts(cache_key, embedding, posts):
+    """Add generated posts to the session's semantic cache"""
+    caches = st.session_state.setdefault("post_cache", {})
+    cache = caches.get(cache_key)
+    if cache is None:
+        caches[cache_key] = {"embeddings": embedding[np.newaxis, :], "posts": [posts]}
+    else:
+        cache["embeddings"] = np.vstack([cache["embeddings"], embedding])
+        cache["posts"].append(posts)
 
 def main():
     st.set_page_config(page_title="Social Media Post Generator", layout="wide")
     
-    # Custom CSS
-    st.markdown("""
-        <style>
-        .stTextInput > div > div > input {
-            background-color: #f0f2f6;
-        }
-        .stTextArea > div > div > textarea {
-            background-color: #f0f2f6;
-        }
-        .output-container {
-            background-color: #f8f9fa;
-            padding: 20px;
-            border-radius: 10px;
-            border: 1px solid #dee2e6;
-            margin-top: 5px;
-        }
-        .generate-button {
-            background-color: #4CAF50;
-            color: white;
-            padding: 10px 20px;
-            border-radius: 5px;
-            border: none;
-            cursor: pointer;
-            width: 100%;
-        }
-        </style>
-    """, unsafe_allow_html=True)
+    # Custom CSS; Streamlit drops elements a rerun doesn't emit, so it is sent every run
+    st.markdown(_CSS, unsafe_allow_html=True)
     
     # App title and description
     st.title("📱 Social Media Post Generator (AI-Powered)")
@@ -161,6 +476,23 @@ def main():
         api_key = st.sidebar.text_input("Enter OpenAI API Key", type="password")
         st.sidebar.markdown("[Get OpenAI API Key](https://platform.openai.com/api-keys)")
     
+    # Resolve the model once; it is passed to every generation call and cache key.
+    # OpenAI models are listed faster, cheaper first.
+    if api_choice == "Gemini":
+        model_name = GEMINI_MODEL_NAME
+    else:
+        model_name = st.sidebar.selectbox("OpenAI Model", OPENAI_MODELS)
+    
+    generation_mode = st.sidebar.radio(
+        "Generation mode", ["Single JSON request", "Stream per platform"],
+        help="One API call returning all three posts as JSON, or one streamed call per platform "
+             "showing each post as it is written"
+    )
+    batch_requests = generation_mode == "Single JSON request"
+    reuse_similar = st.sidebar.checkbox("Reuse posts for near-identical events", value=True,
+                                        help="Reuses posts generated earlier in this session for an event with "
+                                             "the same name, date and venue and a near-identical description")
+    
     if not api_key:
         st.sidebar.warning(f"Please enter your {api_choice} API key to continue")
         st.info(f"👈 Enter your {api_choice} API key in the sidebar to get started")
@@ -175,11 +507,18 @@ def main():
         st.error(f"Error initializing {api_choice}: {str(e)}")
         return
     
+    # Posts are only shown for the provider, model and key that generated them;
+    # the key is hashed so it isn't kept in session state a second time
+    posts_source = (api_choice, model_name, hashlib.sha256(api_key.encode()).hexdigest())
+    if st.session_state.get("posts_source") != posts_source:
+        st.session_state.pop("posts", None)
+    
     # Input section
     with st.container():
         col1, col2 = st.columns(2)
         
-        with col1:
+        # Inputs live in a form so typing doesn't rerun the script until it is submitted
+        with col1, st.form("event_form"):
             event_name = st.text_input("Event Name", placeholder="Enter event name")
             date = st.date_input("Event Date", min_value=datetime.today())
             venue = st.text_input("Venue", placeholder="Enter event venue")
@@ -188,31 +527,82 @@ def main():
                                      height=150)
             
             # Generate button
-            generate = st.button("Generate Posts", type="primary", use_container_width=True)
+            generate = st.form_submit_button("Generate Posts", type="primary", use_container_width=True)
+        
+        # Validate the inputs once; every generation call then takes the same EventSpec
+        spec = None
+        if generate:
+            try:
+                spec = EventSpec(event_name, date.strftime("%B %d, %Y"), venue, description)
+            except ValueError as e:
+                # Don't leave posts for the previous event under a failed submission
+                st.session_state.pop("posts", None)
+                col2.warning(str(e))
         
         # Generate posts only if all fields are filled and button is clicked
-        if all([event_name, date, venue, description]) and generate:
+        if spec is not None:
             with col2:
-                formatted_date = date.strftime("%B %d, %Y")
+                cache_key = similar_posts_key(spec, api_choice, model_name)
+                
+                # Exact repeats are served from memory, then disk, without any API call
+                requests = generation_requests(spec, api_choice, model_name, batch_requests)
+                prompts = [prompt for prompt, _ in requests]
+                posts = find_cached_posts(requests, batch_requests)
+                
+                # Otherwise reuse posts from a near-identical event generated earlier this session.
+                # The embedding runs alongside generation; it is only waited on up front when
+                # there are earlier posts to compare against
+                pending_embedding = None
+                if posts is None and reuse_similar:
+                    pending_embedding = submit_async(embed_description(model, api_choice, spec.description))
+                    if has_similar_posts(cache_key):
+                        with st.spinner("Checking for similar events..."):
+                            embedding = pending_embedding.result()
+                        if embedding is not None:
+                            posts = find_similar_posts(cache_key, embedding)
+                            if posts is not None:
+                                st.caption("♻️ Reusing posts generated for a near-identical event")
                 
-                # Generate posts for each platform
-                with st.spinner(f"Generating posts using {api_choice} AI..."):
-                    for platform in ["LinkedIn", "Twitter", "WhatsApp"]:
-                        st.subheader(f"{platform} Post")
-                        if api_choice == "Gemini":
-                            post = generate_post_with_gemini(model, platform, 
-                                                           event_name, formatted_date, 
-                                                           description, venue)
-                        else:
-                            post = generate_post_with_chatgpt(model, platform, 
-                                                            event_name, formatted_date, 
-                                                            description, venue)
-                        html(create_copy_button(post, platform.lower()))
-                        st.markdown('<div class="output-container">', unsafe_allow_html=True)
+                generated = posts is None
+                if generated and not batch_requests:
+                    # Stream each platform's post into a temporary preview as tokens arrive;
+                    # it is replaced by the rendered posts below once complete
+                    preview = st.empty()
+                    with preview.container():
+                        slots = {}
+                        for platform in PLATFORMS:
+                            st.subheader(f"{platform} Post")
+                            with st.container(border=True):
+                                slots[platform] = st.empty()
+                    
+                    posts = stream_posts(model, api_choice, prompts, model_name, slots)
+                    preview.empty()
+                elif generated:
+                    # Generate all posts in one batched JSON call
+                    with st.spinner(f"Generating posts using {api_choice} AI..."):
+                        posts = run_async(generate_all_posts(model, api_choice, prompts[0], model_name))
+                if generated:
+                    store_posts(requests, batch_requests, posts)
+                
+                if (generated and pending_embedding is not None
+                        and not any(post.startswith(ERROR_PREFIX) for post in posts)):
+                    embedding = pending_embedding.result()
+                    if embedding is not None:
+                        store_similar_posts(cache_key, embedding, posts)
+                
+                st.session_state["posts"] = {platform.lower(): post for platform, post in zip(PLATFORMS, posts)}
+                st.session_state["posts_source"] = posts_source
+        
+        # Render the latest posts from session state so unrelated reruns don't lose them
+        with col2:
+            if "posts" in st.session_state:
+                posts = [st.session_state["posts"][platform.lower()] for platform in PLATFORMS]
+                html(create_copy_buttons(posts), height=COPY_BUTTONS_HEIGHT)
+                for platform, post in zip(PLATFORMS, posts):
+                    st.subheader(f"{platform} Post")
+                    with st.container(border=True):
                         st.markdown(post)
-                        st.markdown('</div>', unsafe_allow_html=True)
-        else:
-            with col2:
+            else:
                 if not generate:
                     st.info("👈 Fill in all the event details and click 'Generate Posts'")
                 